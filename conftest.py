@@ -0,0 +1 @@
+# pytest puts the directory of this file on sys.path, which makes data_cleaner and data_reader importable in tests/
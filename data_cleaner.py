@@ -1,10 +1,28 @@
+import numpy as np
 import pandas as pd
+import polars as pl
 from datetime import timedelta
 
+# the prognoses are given to the second, the timetable only to the minute
+DATETIME_FORMATS = {
+    'AN_PROGNOSE': '%d.%m.%Y %H:%M:%S',
+    'ANKUNFTSZEIT': '%d.%m.%Y %H:%M',
+    'AB_PROGNOSE': '%d.%m.%Y %H:%M:%S',
+    'ABFAHRTSZEIT': '%d.%m.%Y %H:%M',
+    'BETRIEBSTAG': '%d.%m.%Y',
+}
 
+# the columns we filter on. They only have a handful of distinct values.
+FILTER_COLUMNS = ['BETREIBER_ABK', 'PRODUKT_ID', 'AN_PROGNOSE_STATUS', 'AB_PROGNOSE_STATUS']
 
-def remove_unnecessary_columns(df):
-    """Removes columns from the istdaten df that are not necessary for the further processing
+# the range of delays that are realistic, in seconds
+MIN_DELAY_S = timedelta(minutes=-10) / timedelta(seconds=1)
+MAX_DELAY_S = timedelta(hours=1) / timedelta(seconds=1)
+
+
+def convert_filter_columns_to_categorical(df):
+    """Converts the columns of the istdaten df used for filtering to categorical, in case they are not yet.
+    Comparisons on categorical columns only compare the integer codes.
 
     Parameters
     ----------
@@ -15,12 +33,13 @@ def remove_unnecessary_columns(df):
     Returns
     -------
     pd.DataFrame
-        The istdaten DataFrame without the unnecessary columns
+        The istdaten DataFrame with categorical filter columns
     """
 
-    df.drop(columns= [ 'BETREIBER_ID', 'LINIEN_ID', 'UMLAUF_ID',
-                     'VERKEHRSMITTEL_TEXT', 'FAELLT_AUS_TF'], inplace=True)
-    return df
+    columns = [c for c in FILTER_COLUMNS if df[c].dtype == 'object']
+    if not columns:
+        return df
+    return df.astype({c: 'category' for c in columns})
 
 # we are only interested in sbb
 def select_sbb(df):
@@ -41,60 +60,16 @@ def select_sbb(df):
     df = df[df["BETREIBER_ABK"] == "SBB"]
     return df
 
-def select_trains(df):
-    """Only select entries from the istdaten df where a train is involved
-
-    Parameters
-    ----------
-    df : pd.DataFrame
-        the istdaten DataFrame
-
-
-    Returns
-    -------
-    pd.DataFrame
-        The istdaten DataFrame for trains
-    """
-
-    df = df[df['PRODUKT_ID'] == "Zug"]
-    return df
-
-# filter data where the an/ab prognose is "REAL"
-def real_prognose_filter_abfahrt(df):
-    """Only select entries from the istdaten df where the  AB_PROGNOSE_STATUS is REAL.
-
-    Parameters
-    ----------
-    df : pd.DataFrame
-        the istdaten DataFrame
-
-
-    Returns
-    -------
-    pd.DataFrame
-        The istdaten DataFrame REAL delays
-    """
-
-    df = df[df['AB_PROGNOSE_STATUS'] == 'REAL']
-    return df
-
-def real_prognose_filter_ankunft(df):
-    """Only select entries from the istdaten df where the  AN_PROGNOSE_STATUS is REAL.
-
-    Parameters
-    ----------
-    df : pd.DataFrame
-        the istdaten DataFrame
-
-
-    Returns
-    -------
-    pd.DataFrame
-        The istdaten DataFrame REAL delays
-    """
-
-    df = df[df['AN_PROGNOSE_STATUS'] == 'REAL']
-    return df
+def _to_datetime(s, fmt):
+    if not isinstance(s.dtype, pd.CategoricalDtype):
+        # parse with a fixed format in one vectorized call. cache=True parses every distinct string only once, which
+        # pays off as the same timestamps appear many times per day.
+        return pd.to_datetime(s, format=fmt, cache=True, errors='coerce')
+    # a categorical column already knows its distinct values, e.g. BETRIEBSTAG only has one per day.
+    # Parse those and look them up by code. The code -1 of missing values picks the NaT appended at the end.
+    categories = pd.to_datetime(s.cat.categories, format=fmt, errors='coerce').values
+    categories = np.append(categories, np.datetime64('NaT', 'ns'))
+    return pd.Series(categories[s.cat.codes.values], index=s.index, name=s.name)
 
 def convert_to_datetimes(df):
     """Convert string datetimes in the istdaten df to datetimes
@@ -111,55 +86,34 @@ def convert_to_datetimes(df):
         The istdaten DataFrame with datetime.datetime format instead of string.
     """
 
-    #switch off annoying warnings
-    pd.options.mode.chained_assignment = None
-    df['AN_PROGNOSE'] = df['AN_PROGNOSE'].apply(pd.to_datetime, dayfirst=True)
-    df['ANKUNFTSZEIT'] = df['ANKUNFTSZEIT'].apply(pd.to_datetime, dayfirst=True)
-    df['AB_PROGNOSE'] = df['AB_PROGNOSE'].apply(pd.to_datetime, dayfirst=True)
-    df['ABFAHRTSZEIT'] = df['ABFAHRTSZEIT'].apply(pd.to_datetime, dayfirst=True)
-    df['BETRIEBSTAG'] = df['BETRIEBSTAG'].apply(pd.to_datetime, dayfirst=True)
-    pd.options.mode.chained_assignment = 'warn'
+    return df.assign(**{c: _to_datetime(df[c], fmt) for c, fmt in DATETIME_FORMATS.items()})
 
-    return df
-
-# filter bad data. i.e. nans
-def bad_data_filter_abfahrt(df):
-    """Filter rows where  AB_PROGNOSE aor ABFAHRTSZEIT is not nan.
-
-    Parameters
-    ----------
-    df : pd.DataFrame
-        the istdaten DataFrame
-
-
-    Returns
-    -------
-    pd.DataFrame
-        The istdaten DataFrame without NaNs.
-    """
-
-    df = df[(df['AB_PROGNOSE'].notna()) & (df['ABFAHRTSZEIT'].notna())]
-    return df
-
-def bad_data_filter_abfahrt(df):
-    """Filter rows where  AN_PROGNOSE aor ANKUNFTSZEIT is not nan.
+## calculate the delays. We calculate those in seconds. Reason: timedeltas suck.
+def delay_in_seconds(prognose, planned):
+    """Calculate the delay between the prognosed and the planned datetimes in seconds.
 
     Parameters
     ----------
-    df : pd.DataFrame
-        the istdaten DataFrame
+    prognose : pd.Series
+        the prognosed datetimes
+    planned : pd.Series
+        the planned datetimes
 
 
     Returns
     -------
-    pd.DataFrame
-        The istdaten DataFrame without NaNs.
+    np.ndarray
+        The delays in seconds, NaN where one of the datetimes is missing.
     """
 
-    df = df[(df['AN_PROGNOSE'].notna()) & (df['ANKUNFTSZEIT'].notna())]
-    return df
+    # subtract the raw nanoseconds instead of going through a timedelta array. Make sure the unit is ns first, and
+    # divide instead of multiplying with 1e-9, which is exact for whole seconds.
+    prognose = prognose.values.astype('datetime64[ns]', copy=False)
+    planned = planned.values.astype('datetime64[ns]', copy=False)
+    delay = (prognose.view('i8') - planned.view('i8')) / 1e9
+    delay[np.isnat(prognose) | np.isnat(planned)] = np.nan
+    return delay
 
-## calculate the delays. We calculate those in seconds. Reason: timedeltas suck.
 def calculate_delay_abfahrt(df):
     """Add a column to the istdaten df corresponding to  departure delays, measured in seconds.
 
@@ -175,7 +129,7 @@ def calculate_delay_abfahrt(df):
         The istdaten DataFrame with the new delay columns.
     """
 
-    df['ABFAHRTSVERSPAETUNG_s'] = (df['AB_PROGNOSE'] - df['ABFAHRTSZEIT']) / pd.Timedelta(seconds=1)
+    df['ABFAHRTSVERSPAETUNG_s'] = delay_in_seconds(df['AB_PROGNOSE'], df['ABFAHRTSZEIT'])
     return df
 
 def calculate_delay_ankunft(df):
@@ -193,7 +147,7 @@ def calculate_delay_ankunft(df):
         The istdaten DataFrame with the new delay columns.
     """
 
-    df['ANKUNFTSVERSPAETUNG_s'] = (df['AN_PROGNOSE'] - df['ANKUNFTSZEIT']) / pd.Timedelta(seconds=1)
+    df['ANKUNFTSVERSPAETUNG_s'] = delay_in_seconds(df['AN_PROGNOSE'], df['ANKUNFTSZEIT'])
     return df
 
 # no train in switzerland has a delay longer than 1 hour
@@ -212,8 +166,7 @@ def remove_crazy_delays_abfahrt(df):
         The istdaten DataFrame without crazy delays.
     """
 
-    df = df[(df['ABFAHRTSVERSPAETUNG_s'] > timedelta(minutes=-10) / timedelta(seconds=1)) & (
-                df['ABFAHRTSVERSPAETUNG_s'] < timedelta(hours=1) / timedelta(seconds=1))]
+    df = df[(df['ABFAHRTSVERSPAETUNG_s'] > MIN_DELAY_S) & (df['ABFAHRTSVERSPAETUNG_s'] < MAX_DELAY_S)]
 
     return df
 
@@ -232,8 +185,7 @@ def remove_crazy_delays_ankunft(df):
         The istdaten DataFrame without crazy delays.
     """
 
-    df = df[(df['ANKUNFTSVERSPAETUNG_s'] > timedelta(minutes=-10) / timedelta(seconds=1)) & (
-                df['ANKUNFTSVERSPAETUNG_s'] < timedelta(hours=1) / timedelta(seconds=1))]
+    df = df[(df['ANKUNFTSVERSPAETUNG_s'] > MIN_DELAY_S) & (df['ANKUNFTSVERSPAETUNG_s'] < MAX_DELAY_S)]
 
     return df
 
@@ -274,10 +226,14 @@ def clean_data_abfahrt(df):
         The cleaned istdaten DataFrame
     """
 
-    df = select_trains(df)
-    df = remove_unnecessary_columns(df)
-    df = real_prognose_filter_abfahrt(df)
-    df = bad_data_filter_abfahrt(df)
+    df = convert_filter_columns_to_categorical(df)
+    # select trains with a REAL departure prognose and no missing departure times in one go, instead of slicing
+    # (and copying) the whole df once per filter. The masks are built on the plain arrays to skip index alignment.
+    mask = ((df['PRODUKT_ID'].values == 'Zug')
+            & (df['AB_PROGNOSE_STATUS'].values == 'REAL')
+            & df['AB_PROGNOSE'].notna().values
+            & df['ABFAHRTSZEIT'].notna().values)
+    df = df.loc[mask]
     df = convert_to_datetimes(df)
     df = calculate_delay_abfahrt(df)
     df = remove_crazy_delays_abfahrt(df)
@@ -285,13 +241,68 @@ def clean_data_abfahrt(df):
 
     return df
 
+def _parse_datetime_lazy(column, fmt):
+    # chrono does not parse a date without a time as datetime, so dates are parsed as such and cast afterwards
+    dtype = pl.Datetime if '%H' in fmt else pl.Date
+    return pl.col(column).str.strptime(dtype, fmt=fmt, strict=False).cast(pl.Datetime)
+
+def clean_data_abfahrt_lazy(lf):
+    """Perform the same cleaning steps as clean_data_abfahrt on a polars LazyFrame. Polars pushes the filters down
+    into the scan of the csv or parquet file and runs the plan on all cores.
+
+    Parameters
+    ----------
+    lf : pl.LazyFrame
+        the istdaten LazyFrame, with the datetimes still as strings
+
+
+    Returns
+    -------
+    pl.LazyFrame
+        The LazyFrame for the cleaned istdaten data, without the conversion to categorical
+    """
+
+    delay = (pl.col('AB_PROGNOSE') - pl.col('ABFAHRTSZEIT')).dt.seconds().cast(pl.Float64)
+    return (
+        lf
+        # the filter and datetime columns can be categorical in parquet files, handle them as strings
+        .with_columns([pl.col(c).cast(pl.Utf8) for c in FILTER_COLUMNS + list(DATETIME_FORMATS)])
+        .filter((pl.col('PRODUKT_ID') == 'Zug')
+                & (pl.col('AB_PROGNOSE_STATUS') == 'REAL')
+                & pl.col('AB_PROGNOSE').is_not_null()
+                & pl.col('ABFAHRTSZEIT').is_not_null())
+        .with_columns([_parse_datetime_lazy(c, fmt) for c, fmt in DATETIME_FORMATS.items()])
+        .with_column(delay.alias('ABFAHRTSVERSPAETUNG_s'))
+        .filter((pl.col('ABFAHRTSVERSPAETUNG_s') > MIN_DELAY_S) & (pl.col('ABFAHRTSVERSPAETUNG_s') < MAX_DELAY_S))
+    )
+
+def collect_cleaned_data_abfahrt(lf):
+    """Run clean_data_abfahrt_lazy on a polars LazyFrame and convert the result to the same pandas DataFrame as
+    clean_data_abfahrt returns, apart from the index.
+
+    Parameters
+    ----------
+    lf : pl.LazyFrame
+        the istdaten LazyFrame, with the datetimes still as strings
+
+
+    Returns
+    -------
+    pd.DataFrame
+        The cleaned istdaten DataFrame
+    """
+
+    df = clean_data_abfahrt_lazy(lf).collect().to_pandas()
+    return convert_to_categorical(df)
+
 def prepare_data(df):
-    """Clean the data and select only SBB
+    """Clean the data and select only SBB. Data that is already cleaned, i.e. has the departure delays, is not
+    cleaned again.
 
     Parameters
     ----------
     df : pd.DataFrame
-        the istdaten DataFrame
+        the istdaten DataFrame, cleaned or not
 
 
     Returns
@@ -300,7 +311,10 @@ def prepare_data(df):
         The cleaned istdaten DataFrame for SBB
     """
 
+    df = convert_filter_columns_to_categorical(df)
     df = select_sbb(df)
-    df = clean_data_abfahrt(df)
+    # the cleaned data already went through all cleaning steps, only the selection of SBB is left
+    if 'ABFAHRTSVERSPAETUNG_s' not in df.columns:
+        df = clean_data_abfahrt(df)
     #df = remove_crazy_delays(df)
     return df
\ No newline at end of file
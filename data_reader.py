@@ -1,18 +1,122 @@
 import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
 import configparser
 import os
 import requests
-from clint.textui import progress
+from tqdm import tqdm
 import datetime
 import zipfile
+import shutil
+import itertools
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 import data_cleaner as dc
 
+# the config and a relative data directory are found next to this module, not in the current working directory
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
 config = configparser.ConfigParser()
-config.read('config.ini')
+config.read(os.path.join(_MODULE_DIR, 'config.ini'))
+
+# the filenames are formatted with date.strftime. The data directory is only created when the first file is written.
+DATA_DIR = os.path.normpath(os.path.join(_MODULE_DIR, config['data']['directory']))
+_DATA_DIR_FORMAT = DATA_DIR.replace('%', '%%')
+# the version of the schema and content of the parquet files written by this module. Bump it whenever either changes,
+# such that parquet files written by an older version are not read, but created again. The downloaded csv and
+# archive files do not depend on it.
+CACHE_VERSION = 2
+CSV_FILENAME = os.path.join(_DATA_DIR_FORMAT, "%Y-%m-%d_istdaten.csv")
+PARQUET_FILENAME = os.path.join(_DATA_DIR_FORMAT, f"%Y-%m-%d_istdaten_v{CACHE_VERSION}.parquet")
+CLEANED_PARQUET_FILENAME = os.path.join(_DATA_DIR_FORMAT, f"%Y-%m-%d_istdaten_cleaned_v{CACHE_VERSION}.parquet")
+PREPARED_PARQUET_FILENAME = os.path.join(_DATA_DIR_FORMAT, f"%Y-%m-%d_istdaten_prepared_v{CACHE_VERSION}.parquet")
+ARCHIVE_FILENAME = os.path.join(_DATA_DIR_FORMAT, "ist-daten-%Y-%m.zip")
+
+# the istdaten columns needed for the further processing. All others are not even read from the csv.
+# The columns whose values repeat a lot are read as categorical, e.g. BETRIEBSTAG has only one value per file and the
+# planned times only one per minute. Only the trip ids and the prognoses, given to the second, stay strings. The
+# dtypes are fixed, such that all daily parquet files have the same schema.
+ISTDATEN_DTYPES = {
+    'BETRIEBSTAG': 'category',
+    'FAHRT_BEZEICHNER': str,
+    'BETREIBER_ABK': 'category',
+    'BETREIBER_NAME': 'category',
+    'PRODUKT_ID': 'category',
+    'LINIEN_TEXT': 'category',
+    'ZUSATZFAHRT_TF': 'category',
+    'BPUIC': 'category',
+    'HALTESTELLEN_NAME': 'category',
+    'ANKUNFTSZEIT': 'category',
+    'AN_PROGNOSE': str,
+    'AN_PROGNOSE_STATUS': 'category',
+    'ABFAHRTSZEIT': 'category',
+    'AB_PROGNOSE': str,
+    'AB_PROGNOSE_STATUS': 'category',
+    'DURCHFAHRT_TF': 'category',
+}
+
+# each worker of create_parquet_files_in_parallel holds a full day in memory, so only a few run at the same time
+MAX_WORKERS = 4
+
+@lru_cache(maxsize=1)
+def _list_data_directory():
+    try:
+        with os.scandir(DATA_DIR) as entries:
+            return frozenset(entry.name for entry in entries)
+    except FileNotFoundError:
+        # nothing was written yet
+        return frozenset()
+
+def file_exists(filename):
+    """Checks if a file exists in the configured data directory. The directory is listed once and the listing is
+    cached, it is refreshed whenever a file is written by this module.
 
-def create_directory_if_not_exists(directory):
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+    Parameters
+    ----------
+    filename : str
+        The filename of a file in the data directory
+
+
+    Returns
+    -------
+    bool
+        True if the file exists
+    """
+
+    return os.path.basename(filename) in _list_data_directory()
+
+def available_dates(filename_format):
+    """Returns the dates for which a file exists in the configured data directory, e.g. the dates that are already
+    prepared. The dates are taken from the cached listing of the data directory, so the files themselves serve as
+    the manifest and can never get out of sync with it.
+
+    Parameters
+    ----------
+    filename_format : str
+        The filename format of the files, e.g. CLEANED_PARQUET_FILENAME or PREPARED_PARQUET_FILENAME
+
+
+    Returns
+    -------
+    list of datetime.datetime
+        The sorted dates for which a file exists
+    """
+
+    name_format = os.path.basename(filename_format)
+    # the literal end of the format, e.g. _istdaten_cleaned_v2.parquet, sorts out most other files without parsing them
+    suffix = name_format[name_format.rfind('%') + 2:]
+    dates = []
+    for name in _list_data_directory():
+        if not name.endswith(suffix):
+            continue
+        try:
+            dates.append(datetime.datetime.strptime(name, name_format))
+        except ValueError:
+            # another kind of file
+            pass
+    return sorted(dates)
 
 def read_csv(date):
     """Reads the istdaten csv file from the configured data directory for a given date
@@ -29,14 +133,74 @@ def read_csv(date):
         The dateframe corresponding to the istdaten csv file
     """
 
-    filename = os.path.join(
-        config['data']['directory'],
-        date.strftime("%Y-%m-%d_istdaten.csv")
-    )
-    create_directory_if_not_exists(config['data']['directory'])
-    df = pd.read_csv(filename, sep=';', dtype=str)
+    return read_csv_file(date.strftime(CSV_FILENAME))
+
+def read_csv_file(filename):
+    """Reads a istdaten csv file, with only the needed columns
+
+    Parameters
+    ----------
+    filename : str
+        The filename of the istdaten csv file
+
+
+    Returns
+    -------
+    pd.DataFrame
+        The dateframe corresponding to the istdaten csv file
+    """
+
+    df = pd.read_csv(filename, sep=';', usecols=list(ISTDATEN_DTYPES), dtype=ISTDATEN_DTYPES, engine='c')
     return df
 
+def scan_file(filename):
+    """Returns a polars LazyFrame scanning a istdaten parquet or csv file, with only the needed columns
+
+    Parameters
+    ----------
+    filename : str
+        The filename of the istdaten parquet or csv file
+
+
+    Returns
+    -------
+    pl.LazyFrame
+        The LazyFrame scanning the istdaten file, with all columns as strings or categorical
+    """
+
+    if filename.endswith('.parquet'):
+        lf = pl.scan_parquet(filename)
+    else:
+        lf = pl.scan_csv(filename, sep=';', dtypes={c: pl.Utf8 for c in ISTDATEN_DTYPES})
+    # only the needed columns are read from the file
+    return lf.select(list(ISTDATEN_DTYPES))
+
+def scan_data(date):
+    """Returns a polars LazyFrame scanning the istdaten file for a given date. In case the parquet file exists, it
+    will scan this file, otherwise the csv file. In case neither exists, it will download the archive file for a month
+    and extract the csv file of the date first.
+
+    Parameters
+    ----------
+    date : datetime.datetime
+        The date where one wishes to scan the istdaten file
+
+
+    Returns
+    -------
+    pl.LazyFrame
+        The LazyFrame scanning the istdaten file, with all columns as strings or categorical
+    """
+
+    filename = date.strftime(PARQUET_FILENAME)
+    if file_exists(filename):
+        return scan_file(filename)
+
+    filename = date.strftime(CSV_FILENAME)
+    if not file_exists(filename):
+        download_archive(date)
+    return scan_file(filename)
+
 def save_dataframe_to_parquet( df, date):
     """Save a istdaten dateframe as a parquet file in the configured data directory
 
@@ -53,12 +217,31 @@ def save_dataframe_to_parquet( df, date):
     None
     """
 
-    filename = os.path.join(
-        config['data']['directory'],
-        date.strftime("%Y-%m-%d_istdaten.parquet")
-    )
-    create_directory_if_not_exists(config['data']['directory'])
-    df.to_parquet(filename)
+    filename = date.strftime(PARQUET_FILENAME)
+    write_parquet(df, filename)
+
+def write_parquet(df, filename):
+    """Write a istdaten DataFrame to a zstd compressed parquet file, with the datetimes stored with a precision of
+    milliseconds. Categorical columns are stored dictionary encoded.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The istdaten DataFrame one wants to save
+    filename : str
+        The filename of the parquet file
+
+
+    Returns
+    -------
+    None
+    """
+
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    # the istdaten are only precise to the second, the nanoseconds pandas uses are not needed
+    df.to_parquet(filename, engine='pyarrow', compression='zstd', compression_level=3, use_dictionary=True,
+                  coerce_timestamps='ms', allow_truncated_timestamps=True)
+    _list_data_directory.cache_clear()
 
 def read_dataframe_from_parquet(date):
     """Reads a istdaten DataFrame from a parquet file
@@ -75,22 +258,45 @@ def read_dataframe_from_parquet(date):
         The dateframe corresponding to the istdaten parquet file
     """
 
-    filename = os.path.join(
-        config['data']['directory'],
-        date.strftime("%Y-%m-%d_istdaten.parquet")
-        )
-    create_directory_if_not_exists(config['data']['directory'])
+    filename = date.strftime(PARQUET_FILENAME)
     df = pd.read_parquet(filename)
     return df
 
-def download_archive(date):
-    """Downloading and unzipping a archive file containing the csv files for one month, and stored in the configured
-    data directory
+def read_dataframe_from_parquet_files(filenames):
+    """Reads a single istdaten DataFrame from several parquet files in one go
+
+    Parameters
+    ----------
+    filenames : list of str
+        The filenames of the parquet files
+
+
+    Returns
+    -------
+    pd.DataFrame
+        The dateframe corresponding to all the parquet files
+    """
+
+    # concatenate the arrow tables instead of one DataFrame per file. promote only fills columns that are missing or
+    # entirely null in a file, the other column types have to agree between the files. The fixed dtypes of
+    # ISTDATEN_DTYPES take care of that, and CACHE_VERSION keeps files with an older schema out. self_destruct frees
+    # the arrow buffers while converting, so the data is not held twice.
+    tables = [pq.read_table(filename) for filename in filenames]
+    table = pa.concat_tables(tables, promote=True)
+    del tables
+    return table.to_pandas(self_destruct=True, split_blocks=True)
+
+def download_archive(date, position=0):
+    """Downloading a archive file containing the csv files for one month, and extracting the csv file for the given
+    date into the configured data directory. The archive is kept, such that the other dates of the month can be
+    extracted without downloading it again.
 
     Parameters
     ----------
     date : datetime.datetime
-        The date. The archive is downloaded for the date's month and year
+        The date. The archive is downloaded for the date's month and year, the csv file is extracted for the date
+    position : int
+        The line of the progress bar, such that the bars of concurrent downloads do not overwrite each other
 
 
     Returns
@@ -104,30 +310,45 @@ def download_archive(date):
     else:
         archive_url = date.strftime(
             'https://opentransportdata.swiss/wp-content/uploads/ist-daten-archive/%y_%m.zip')
-    # download file with progress bar
-    r = requests.get(archive_url, stream=True)
-    path = os.path.join(
-        config['data']['directory'],
-        date.strftime('ist-daten-%Y-%m.zip')
-    )
-    create_directory_if_not_exists(config['data']['directory'])
-    with open(path, 'wb') as f:
-        total_length = int(r.headers.get('content-length'))
-        for chunk in progress.bar(r.iter_content(chunk_size=1024), expected_size=(total_length / 1024) + 1):
-            if chunk:
-                f.write(chunk)
-                f.flush()
-
-    # unzip file
+    path = date.strftime(ARCHIVE_FILENAME)
+    if not file_exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        # download file with progress bar. Write to a temporary file first, such that an interrupted download does not
+        # leave a broken archive behind.
+        r = requests.get(archive_url, stream=True)
+        # do not store an error page as the archive
+        r.raise_for_status()
+        # write in chunks of 1 MiB, the archives are several GB large
+        chunk_size = 1 << 20
+        # a chunked response has no length, the progress bar then only counts the bytes
+        total_length = r.headers.get('content-length')
+        total_length = int(total_length) if total_length is not None else None
+        with open(path + '.part', 'wb') as f, \
+                tqdm(total=total_length, unit='B', unit_scale=True, desc=os.path.basename(path),
+                     position=position) as progress_bar:
+            for chunk in r.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    f.write(chunk)
+                    progress_bar.update(len(chunk))
+        os.replace(path + '.part', path)
+
+    # only unzip the csv file of the date
+    csv_name = date.strftime("%Y-%m-%d_istdaten.csv")
     with zipfile.ZipFile(path, "r") as zip_ref:
-        zip_ref.extractall(config['data']['directory'])
+        members = {os.path.basename(name): name for name in zip_ref.namelist()}
+        if csv_name not in members:
+            raise FileNotFoundError(f"{csv_name} is not contained in the archive {path}")
+        with zip_ref.open(members[csv_name]) as source, \
+                open(date.strftime(CSV_FILENAME), 'wb') as target:
+            shutil.copyfileobj(source, target, 1 << 20)
+    _list_data_directory.cache_clear()
 
 #read the dateframe from local parquet file, in case it exists, otherwise the csv, otherwise download the archive
 # and extract the csv, and write the parquet file
 def read_data(date):
     """Returns the istdaten DataFrame for a given date. In case the parquet file exists, it will read this file,
     otherwise, it will read the csv file. In case neither exists, it will download the archive file for a month,
-    unzip it, read the corresponding csv file and store it as a parquet file.
+    extract the csv file of the date, read it and store it as a parquet file.
 
     Parameters
     ----------
@@ -142,20 +363,13 @@ def read_data(date):
     """
 
     # first check if the parquet file is available #
-    filename = os.path.join(
-        config['data']['directory'],
-        date.strftime("%Y-%m-%d_istdaten.parquet")
-    )
-    create_directory_if_not_exists(config['data']['directory'])
-    if os.path.exists(filename):
+    filename = date.strftime(PARQUET_FILENAME)
+    if file_exists(filename):
         return read_dataframe_from_parquet(date)
 
     # check if csv file is availabe
-    filename = os.path.join(
-        config['data']['directory'],
-        date.strftime("%Y-%m-%d_istdaten.csv")
-    )
-    if os.path.exists(filename):
+    filename = date.strftime(CSV_FILENAME)
+    if file_exists(filename):
         df = read_csv(date)
         # and store the dataframe as parquet for later reuse
         save_dataframe_to_parquet(df, date)
@@ -169,8 +383,87 @@ def read_data(date):
     save_dataframe_to_parquet(df, date)
     return df
 
+def _init_worker(n_threads):
+    # polars starts one thread per core by default. Share the cores between the workers instead.
+    # polars reads the variable when it creates its thread pool, on first use.
+    os.environ['POLARS_MAX_THREADS'] = str(n_threads)
+
+def _create_parquet_file(read_function, date):
+    # only used in the worker processes. The DataFrame is not sent back to the main process, it is read again from
+    # the parquet file.
+    read_function(date)
+
+def _download_archive_for_dates(positions, dates):
+    # all dates are from the same month, only the first one downloads the archive. Take a free line for the progress
+    # bar while downloading and give it back afterwards.
+    position = positions.get()
+    try:
+        for date in dates:
+            download_archive(date, position)
+    finally:
+        positions.put(position)
+
+def _needs_archive(read_function, date):
+    # the prepared data is made from the cleaned data, and the cleaned data from the raw data. Only if none of the
+    # files that read_function would start from exists, the csv has to be extracted from the archive.
+    if read_function is read_prepared_data and file_exists(date.strftime(CLEANED_PARQUET_FILENAME)):
+        return False
+    return not file_exists(date.strftime(PARQUET_FILENAME)) and not file_exists(date.strftime(CSV_FILENAME))
+
+def create_parquet_files_in_parallel(read_function, dates):
+    """Creates the parquet files for the given dates in parallel, using up to MAX_WORKERS processes that share the
+    cores. The worker processes are spawned, not forked: a fork would inherit the thread pool of polars
+    without its threads, and could deadlock. Callers therefore need the usual `if __name__ == "__main__":` guard.
+    A single date is created in this process, without any workers.
+    The archives that are not available locally are downloaded beforehand, with one thread per monthly archive, such
+    that several processes never download and extract the same monthly archive at the same time. Only the dates that
+    actually need the raw data are downloaded, e.g. not those whose cleaned file exists when preparing.
+
+    Parameters
+    ----------
+    read_function : callable
+        The function reading and storing the DataFrame for a date, i.e. read_data, read_cleaned_data or
+        read_prepared_data
+    dates : list of datetime.datetime
+        The dates where the parquet files should be created
+
+
+    Returns
+    -------
+    None
+    """
+
+    if not dates:
+        return
+    dates_by_month = {}
+    for date in dates:
+        if _needs_archive(read_function, date):
+            dates_by_month.setdefault((date.year, date.month), []).append(date)
+    if dates_by_month:
+        # the downloads are bound by the network, threads are enough. Only a few at a time, to be nice to the server.
+        max_downloads = min(len(dates_by_month), 4)
+        positions = queue.SimpleQueue()
+        for position in range(max_downloads):
+            positions.put(position)
+        with ThreadPoolExecutor(max_workers=max_downloads) as executor:
+            list(executor.map(_download_archive_for_dates, itertools.repeat(positions), dates_by_month.values()))
+
+    if len(dates) == 1:
+        # spawning a worker costs more than it saves for a single day, and it needs the `__main__` guard
+        read_function(dates[0])
+        return
+    cpu_count = os.cpu_count() or 1
+    max_workers = min(len(dates), MAX_WORKERS, cpu_count)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(max(1, cpu_count // max_workers),)) as executor:
+        list(executor.map(_create_parquet_file, itertools.repeat(read_function), dates))
+    # the files were written by the worker processes, the listing of this process does not know about them yet
+    _list_data_directory.cache_clear()
+
 def read_data_from_daterange(date_start, date_end):
-    """Reads the parquet files for a istdaten df for a given daterange
+    """Reads the parquet files for a istdaten df for a given daterange. In case more than one day is missing, the
+    files are created in worker processes, see create_parquet_files_in_parallel. Scripts calling this therefore need
+    the usual `if __name__ == "__main__":` guard.
 
     Parameters
     ----------
@@ -186,14 +479,12 @@ def read_data_from_daterange(date_start, date_end):
         The dateframe corresponding to the istdaten  data from within the daterange.
     """
 
-    delta = date_end - date_start
-    dates = [date_start + datetime.timedelta(days=i) for i in range(delta.days + 1)]
-    dfs = []
-
-    for date in dates:
-        df = read_data(date)
-        dfs.append(df)
-    return pd.concat(dfs)
+    dates = pd.date_range(date_start, date_end, freq='D')
+    filenames = list(dates.strftime(PARQUET_FILENAME))
+    missing_dates = [date for date, filename in zip(dates, filenames) if not file_exists(filename)]
+    # create the parquet files that do not exist yet, the days are independent of each other
+    create_parquet_files_in_parallel(read_data, missing_dates)
+    return read_dataframe_from_parquet_files(filenames)
 
 def read_cleaned_data(date):
     """Reads the parquet file for a cleaned istdaten df. In case it does not exist, it reads the uncleaned file,
@@ -211,17 +502,13 @@ def read_cleaned_data(date):
         The dateframe corresponding to the istdaten cleaned data
     """
 
-    filename = os.path.join(
-        config['data']['directory'],
-        date.strftime("%Y-%m-%d_istdaten_cleaned.parquet")
-    )
-    create_directory_if_not_exists(config['data']['directory'])
-    if os.path.exists(filename):
+    filename = date.strftime(CLEANED_PARQUET_FILENAME)
+    if file_exists(filename):
         return pd.read_parquet(filename)
 
-    df = read_data(date)
-    df = dc.clean_data_abfahrt(df)
-    df.to_parquet(filename)
+    # clean straight from the scan, the uncleaned DataFrame is never built in pandas
+    df = dc.collect_cleaned_data_abfahrt(scan_data(date))
+    write_parquet(df, filename)
     return df
 
 def read_prepared_data(date):
@@ -240,25 +527,23 @@ def read_prepared_data(date):
         The dateframe corresponding to the istdaten cleaned data
     """
 
-    filename = os.path.join(
-        config['data']['directory'],
-        date.strftime("%Y-%m-%d_istdaten_prepared.parquet")
-    )
-    create_directory_if_not_exists(config['data']['directory'])
-    if os.path.exists(filename):
+    filename = date.strftime(PREPARED_PARQUET_FILENAME)
+    if file_exists(filename):
         return pd.read_parquet(filename)
     ## prepared data is cleaned data that is prepared ##
 
 
     df = read_cleaned_data(date)
     df = dc.prepare_data(df)
-    df.to_parquet(filename)
+    write_parquet(df, filename)
     return df
 
 
 
 def read_cleaned_data_from_daterange(date_start, date_end):
-    """Reads the parquet files for a cleaned istdaten df for a given daterange
+    """Reads the parquet files for a cleaned istdaten df for a given daterange. In case more than one day is
+    missing, the files are created in worker processes, see create_parquet_files_in_parallel. Scripts calling this
+    therefore need the usual `if __name__ == "__main__":` guard.
 
     Parameters
     ----------
@@ -274,17 +559,17 @@ def read_cleaned_data_from_daterange(date_start, date_end):
         The dateframe corresponding to the istdaten cleaned data from within the daterange.
     """
 
-    delta = date_end - date_start
-    dates = [date_start + datetime.timedelta(days=i) for i in range(delta.days + 1)]
-    dfs = []
-
-    for date in dates:
-        df = read_cleaned_data(date)
-        dfs.append(df)
-    return pd.concat(dfs)
+    dates = pd.date_range(date_start, date_end, freq='D')
+    filenames = list(dates.strftime(CLEANED_PARQUET_FILENAME))
+    missing_dates = [date for date, filename in zip(dates, filenames) if not file_exists(filename)]
+    # create the cleaned parquet files that do not exist yet, the days are independent of each other
+    create_parquet_files_in_parallel(read_cleaned_data, missing_dates)
+    return read_dataframe_from_parquet_files(filenames)
 
 def read_prepared_data_from_daterange(date_start, date_end):
-    """Reads the parquet files for a prepared istdaten df for a given daterange
+    """Reads the parquet files for a prepared istdaten df for a given daterange. In case more than one day is
+    missing, the files are created in worker processes, see create_parquet_files_in_parallel. Scripts calling this
+    therefore need the usual `if __name__ == "__main__":` guard.
 
     Parameters
     ----------
@@ -300,10 +585,51 @@ def read_prepared_data_from_daterange(date_start, date_end):
         The dateframe corresponding to the istdaten prepared data from within the daterange.
     """
 
-    delta = date_end - date_start
-    dates = [date_start + datetime.timedelta(days=i) for i in range(delta.days + 1)]
-    dfs = []
-    for date in dates:
-        df = read_prepared_data(date)
-        dfs.append(df)
-    return pd.concat(dfs)
+    dates = pd.date_range(date_start, date_end, freq='D')
+    filenames = list(dates.strftime(PREPARED_PARQUET_FILENAME))
+    missing_dates = [date for date, filename in zip(dates, filenames) if not file_exists(filename)]
+    # create the prepared parquet files that do not exist yet, the days are independent of each other
+    create_parquet_files_in_parallel(read_prepared_data, missing_dates)
+    return read_dataframe_from_parquet_files(filenames)
+
+def iter_cleaned_data_from_daterange(date_start, date_end):
+    """Iterates over the cleaned istdaten dfs of a given daterange, one day after the other. Only one day is held in
+    memory at a time, such that aggregations over long dateranges do not need to hold the whole range.
+
+    Parameters
+    ----------
+    date_start : datetime.datetime
+        The date where one wishes to start reading the cleaned istdaten DataFrames
+    date_end : datetime.datetime
+        The date where one wishes to stop reading the cleaned istdaten DataFrames
+
+
+    Yields
+    ------
+    pd.DataFrame
+        The dateframe corresponding to the istdaten cleaned data of one day within the daterange.
+    """
+
+    for date in pd.date_range(date_start, date_end, freq='D'):
+        yield read_cleaned_data(date)
+
+def iter_prepared_data_from_daterange(date_start, date_end):
+    """Iterates over the prepared istdaten dfs of a given daterange, one day after the other. Only one day is held in
+    memory at a time, such that aggregations over long dateranges do not need to hold the whole range.
+
+    Parameters
+    ----------
+    date_start : datetime.datetime
+        The date where one wishes to start reading the prepared istdaten DataFrames
+    date_end : datetime.datetime
+        The date where one wishes to stop reading the prepared istdaten DataFrames
+
+
+    Yields
+    ------
+    pd.DataFrame
+        The dateframe corresponding to the istdaten prepared data of one day within the daterange.
+    """
+
+    for date in pd.date_range(date_start, date_end, freq='D'):
+        yield read_prepared_data(date)
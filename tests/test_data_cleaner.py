@@ -0,0 +1,26 @@
+import os
+import pandas as pd
+import data_cleaner as dc
+import data_reader as dr
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'data', '2022-06-01_istdaten.csv')
+
+
+def as_object(df):
+    # the categories depend on the rows seen before the filtering, only compare the values
+    return df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+
+
+def test_clean_data_abfahrt_keeps_only_realistic_real_departures_of_trains():
+    df = dc.clean_data_abfahrt(dr.read_csv_file(FIXTURE))
+
+    assert list(df['HALTESTELLEN_NAME']) == ['Genève', 'Lausanne', 'Luzern', 'Bern']
+    assert list(df['ABFAHRTSVERSPAETUNG_s']) == [45.0, 56.0, -511.0, 60.0]
+
+
+def test_clean_data_abfahrt_lazy_matches_clean_data_abfahrt():
+    expected = dc.clean_data_abfahrt(dr.read_csv_file(FIXTURE)).reset_index(drop=True)
+    result = dc.collect_cleaned_data_abfahrt(dr.scan_file(FIXTURE))
+
+    pd.testing.assert_frame_equal(as_object(result), as_object(expected))
+
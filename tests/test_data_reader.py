@@ -0,0 +1,32 @@
+import os
+import pandas as pd
+import data_cleaner as dc
+import data_reader as dr
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'data', '2022-06-01_istdaten.csv')
+
+
+def as_object(df):
+    # the categories of the files are unified when reading them, only compare the values
+    return df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+
+
+def test_read_dataframe_from_parquet_files_unifies_the_categories_of_the_days(tmp_path):
+    df = dc.clean_data_abfahrt(dr.read_csv_file(FIXTURE)).reset_index(drop=True)
+    categorical_columns = [c for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)]
+    # each day only knows its own stations, trips and times
+    days = [day.assign(**{c: day[c].cat.remove_unused_categories() for c in categorical_columns})
+            for day in (df.iloc[:2], df.iloc[2:])]
+    assert list(days[0]['HALTESTELLEN_NAME'].cat.categories) != list(days[1]['HALTESTELLEN_NAME'].cat.categories)
+    filenames = [str(tmp_path / f'day_{i}.parquet') for i in range(len(days))]
+    for day, filename in zip(days, filenames):
+        dr.write_parquet(day, filename)
+
+    result = dr.read_dataframe_from_parquet_files(filenames).reset_index(drop=True)
+
+    for c in categorical_columns:
+        assert isinstance(result[c].dtype, pd.CategoricalDtype), c
+    for c in dc.DATETIME_FORMATS:
+        assert pd.api.types.is_datetime64_dtype(result[c]), c
+    expected = pd.concat(days, ignore_index=True)
+    pd.testing.assert_frame_equal(as_object(result), as_object(expected))